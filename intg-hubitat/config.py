@@ -7,6 +7,11 @@ from dataclasses import dataclass
 from pathlib import Path
 from typing import Any
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 _LOG = logging.getLogger(__name__)
 
 
@@ -33,6 +38,8 @@ class ConfigurationManager:
             config_dir = Path(os.getenv("UC_CONFIG_HOME", "."))
         self.config_dir = Path(config_dir)
         self.config_file = self.config_dir / "config.json"
+        # (st_mtime_ns, config) of the last file read or written
+        self._cache: tuple[int, HubitatConfig] | None = None
 
     def load(self) -> HubitatConfig | None:
         """
@@ -41,19 +48,28 @@ class ConfigurationManager:
         Returns:
             HubitatConfig if successful, None otherwise
         """
-        if not self.config_file.exists():
+        try:
+            mtime_ns = self.config_file.stat().st_mtime_ns
+        except FileNotFoundError:
+            self._cache = None
             _LOG.warning("Configuration file does not exist")
             return None
 
+        # Reuse the last parsed config while the file is unchanged
+        if self._cache and self._cache[0] == mtime_ns:
+            return self._cache[1]
+
         try:
-            with open(self.config_file, "r", encoding="utf-8") as f:
-                data = json.load(f)
+            raw = self.config_file.read_bytes()
+            data = orjson.loads(raw) if orjson else json.loads(raw)
 
-            return HubitatConfig(
+            config = HubitatConfig(
                 hub_address=data.get("hub_address", ""),
                 maker_api_id=data.get("maker_api_id", ""),
                 access_token=data.get("access_token", ""),
             )
+            self._cache = (mtime_ns, config)
+            return config
         except Exception as e:
             _LOG.error(f"Failed to load configuration: {e}")
             return None
@@ -77,8 +93,12 @@ class ConfigurationManager:
                 "access_token": config.access_token,
             }
 
-            with open(self.config_file, "w", encoding="utf-8") as f:
-                json.dump(data, f, indent=2)
+            if orjson:
+                self.config_file.write_bytes(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+            else:
+                self.config_file.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+            self._cache = (self.config_file.stat().st_mtime_ns, config)
 
             _LOG.info("Configuration saved successfully")
             return True
@@ -93,6 +113,8 @@ class ConfigurationManager:
         Returns:
             True if successful, False otherwise
         """
+        self._cache = None
+
         try:
             if self.config_file.exists():
                 self.config_file.unlink()
@@ -3,7 +3,8 @@
 
 import asyncio
 import logging
-from typing import Any
+import sys
+from typing import Any, Awaitable, Callable
 
 import ucapi
 from ucapi import IntegrationAPI, StatusCodes
@@ -12,14 +13,272 @@ from config import ConfigurationManager, HubitatConfig
 from entities import EntityMapper
 from hubitat import HubitatClient
 
+try:
+    import uvloop
+except ImportError:
+    uvloop = None
+
 _LOG = logging.getLogger(__name__)
 
 # Global instances
-loop = asyncio.new_event_loop()
+loop = uvloop.new_event_loop() if uvloop else asyncio.new_event_loop()
 api = IntegrationAPI(loop)
 config_manager = ConfigurationManager()
 hubitat_client: HubitatClient | None = None
 entities: dict[str, ucapi.Entity] = {}
+_event_task: asyncio.Task | None = None
+
+# Seconds to wait before reconnecting to the event socket, doubled up to the maximum
+_EVENT_RECONNECT_DELAY = 5.0
+_EVENT_RECONNECT_MAX_DELAY = 60.0
+
+# Entity type (from EntityMapper.classify) -> entity factory
+_TYPE_TABLE = {
+    "light": EntityMapper.create_light_entity,
+    "switch": EntityMapper.create_switch_entity,
+    "climate": EntityMapper.create_climate_entity,
+}
+
+
+async def _send_in_order(
+    client: HubitatClient, device_id: str, commands: list[tuple[str, list[Any]]]
+) -> bool:
+    """Send commands one after another, stopping at the first the hub rejects."""
+    for command, parameters in commands:
+        if not await client.send_command(device_id, command, parameters):
+            return False
+    return True
+
+
+async def _light_on(
+    entity: ucapi.Entity, params: dict[str, Any] | None, client: HubitatClient
+) -> dict[str, Any] | None:
+    """Turn a light on, applying optional brightness, color and color temperature."""
+    device_id = entity.id
+    delta = {}
+    ops = []
+    color_commands = []
+
+    if params:
+        # Handle brightness
+        if "brightness" in params:
+            brightness = params["brightness"]
+            ops.append(client.send_command(device_id, "setLevel", [brightness]))
+            delta["brightness"] = brightness
+
+        # Handle color (hue/saturation)
+        if "hue" in params and "saturation" in params:
+            hue = params["hue"]
+            saturation = params["saturation"]
+            color_commands.append(("setColor", [{"hue": hue, "saturation": saturation}]))
+            delta["hue"] = hue
+            delta["saturation"] = saturation
+
+        # Handle color temperature
+        if "color_temperature" in params:
+            color_temp = params["color_temperature"]
+            color_commands.append(("setColorTemperature", [color_temp]))
+            delta["color_temperature"] = color_temp
+
+    # Color and color temperature each set the bulb's color mode, so they are
+    # sent in a fixed order; the level is independent and goes concurrently.
+    # All of them must land before "on", or the light turns on with its
+    # previous settings and then visibly changes.
+    if color_commands:
+        ops.append(_send_in_order(client, device_id, color_commands))
+    if ops and not all(await asyncio.gather(*ops)):
+        return None
+
+    # Always turn on
+    if not await client.send_command(device_id, "on"):
+        return None
+    delta["state"] = ucapi.light.States.ON
+    return delta
+
+
+def _state_command(
+    command: str, state: Any
+) -> Callable[[ucapi.Entity, dict[str, Any] | None, HubitatClient], Awaitable[dict[str, Any] | None]]:
+    """
+    Build a handler that sends a single Hubitat command and sets a fixed state.
+
+    The command and state are bound in the closure, so the handler does not
+    resolve them through the ucapi modules on every call.
+
+    Args:
+        command: Hubitat command to send
+        state: UC state to report once the hub accepts the command
+
+    Returns:
+        Command handler
+    """
+
+    async def handler(
+        entity: ucapi.Entity, params: dict[str, Any] | None, client: HubitatClient
+    ) -> dict[str, Any] | None:
+        if not await client.send_command(entity.id, command):
+            return None
+        return {"state": state}
+
+    return handler
+
+
+def _toggle_entries(kind: type, states: type) -> dict[tuple[type, Any], tuple[str, Any]]:
+    """Map every state of an on/off entity class to its toggle command and resulting state."""
+    turn_on = ("on", states.ON)
+    entries = {(kind, state): ("off", states.OFF) if state == states.ON else turn_on for state in states}
+    entries[(kind, None)] = turn_on
+    return entries
+
+
+# (entity class, current state) -> (Hubitat command, new state)
+_TOGGLE_MAP = {
+    **_toggle_entries(ucapi.Light, ucapi.light.States),
+    **_toggle_entries(ucapi.Switch, ucapi.switch.States),
+}
+
+
+async def _toggle(
+    entity: ucapi.Entity, params: dict[str, Any] | None, client: HubitatClient
+) -> dict[str, Any] | None:
+    """Toggle a light or switch."""
+    kind = type(entity)
+    # Any state other than on (e.g. a raw hub value before the first update) turns it on
+    command, new_state = _TOGGLE_MAP.get((kind, entity.attributes.get("state"))) or _TOGGLE_MAP[(kind, None)]
+    if not await client.send_command(entity.id, command):
+        return None
+    return {"state": new_state}
+
+
+# Hubitat thermostat mode -> (Hubitat command, UC climate state)
+_HVAC_MAP = {
+    "off": ("off", ucapi.climate.States.OFF),
+    "heat": ("heat", ucapi.climate.States.HEAT),
+    "cool": ("cool", ucapi.climate.States.COOL),
+    "auto": ("auto", ucapi.climate.States.AUTO),
+}
+
+# Last UC climate state -> mode to resume when turned on (off resumes heating)
+_CLIMATE_ON_MAP = {
+    ucapi.climate.States.OFF: _HVAC_MAP["heat"],
+    ucapi.climate.States.HEAT: _HVAC_MAP["heat"],
+    ucapi.climate.States.COOL: _HVAC_MAP["cool"],
+    ucapi.climate.States.AUTO: _HVAC_MAP["auto"],
+}
+
+
+async def _climate_on(
+    entity: ucapi.Entity, params: dict[str, Any] | None, client: HubitatClient
+) -> dict[str, Any] | None:
+    """Turn a thermostat on to its last mode (default to heat)."""
+    cmd_state = _CLIMATE_ON_MAP.get(entity.attributes.get("state", ucapi.climate.States.HEAT))
+    if cmd_state:
+        command, state = cmd_state
+        if not await client.send_command(entity.id, command):
+            return None
+        return {"state": state}
+    return {}
+
+
+async def _climate_hvac_mode(
+    entity: ucapi.Entity, params: dict[str, Any] | None, client: HubitatClient
+) -> dict[str, Any] | None:
+    """Change the HVAC mode of a thermostat."""
+    cmd_state = _HVAC_MAP.get(params.get("hvac_mode")) if params else None
+    if cmd_state:
+        command, state = cmd_state
+        if not await client.send_command(entity.id, command):
+            return None
+        return {"state": state}
+    return {}
+
+
+async def _climate_target_temperature(
+    entity: ucapi.Entity, params: dict[str, Any] | None, client: HubitatClient
+) -> dict[str, Any] | None:
+    """Set the target temperature for the current thermostat mode."""
+    device_id = entity.id
+    delta = {}
+
+    if params and "temperature" in params:
+        temp_f = float(params["temperature"])
+        current_state = entity.attributes.get("state", ucapi.climate.States.HEAT)
+
+        if current_state == ucapi.climate.States.HEAT:
+            if not await client.send_command(device_id, "setHeatingSetpoint", [temp_f]):
+                return None
+            delta["target_temperature_low"] = temp_f
+            delta["target_temperature"] = temp_f
+        elif current_state == ucapi.climate.States.COOL:
+            if not await client.send_command(device_id, "setCoolingSetpoint", [temp_f]):
+                return None
+            delta["target_temperature_high"] = temp_f
+            delta["target_temperature"] = temp_f
+        else:
+            # If in auto or off mode, set heating setpoint by default
+            if not await client.send_command(device_id, "setHeatingSetpoint", [temp_f]):
+                return None
+            delta["target_temperature"] = temp_f
+
+    return delta
+
+
+async def _climate_target_temperature_range(
+    entity: ucapi.Entity, params: dict[str, Any] | None, client: HubitatClient
+) -> dict[str, Any] | None:
+    """Set the heating (low) and cooling (high) setpoints of a thermostat."""
+    device_id = entity.id
+    delta = {}
+
+    if params:
+        if "target_temperature_low" in params:
+            low = float(params["target_temperature_low"])
+            if not await client.send_command(device_id, "setHeatingSetpoint", [low]):
+                return None
+            delta["target_temperature_low"] = low
+
+        if "target_temperature_high" in params:
+            high = float(params["target_temperature_high"])
+            if not await client.send_command(device_id, "setCoolingSetpoint", [high]):
+                return None
+            delta["target_temperature_high"] = high
+
+    return delta
+
+
+def _cmd_key(kind: type, cmd: Any) -> tuple[type, str]:
+    """Dispatch key for a command: the entity class and the interned plain string command id."""
+    return kind, sys.intern(getattr(cmd, "value", cmd))
+
+
+# (entity class, UC command) -> command implementation, keyed on interned plain
+# strings so an interned cmd_id matches by identity. An implementation returns
+# the changed attributes, or None if the hub rejected the command.
+_CMD_DISPATCH: dict[
+    tuple[type, str],
+    Callable[[ucapi.Entity, dict[str, Any] | None, HubitatClient], Awaitable[dict[str, Any] | None]],
+] = {
+    _cmd_key(ucapi.Light, ucapi.light.Commands.ON): _light_on,
+    _cmd_key(ucapi.Light, ucapi.light.Commands.OFF): _state_command("off", ucapi.light.States.OFF),
+    _cmd_key(ucapi.Light, ucapi.light.Commands.TOGGLE): _toggle,
+    _cmd_key(ucapi.Switch, ucapi.switch.Commands.ON): _state_command("on", ucapi.switch.States.ON),
+    _cmd_key(ucapi.Switch, ucapi.switch.Commands.OFF): _state_command("off", ucapi.switch.States.OFF),
+    _cmd_key(ucapi.Switch, ucapi.switch.Commands.TOGGLE): _toggle,
+    _cmd_key(ucapi.Climate, ucapi.climate.Commands.ON): _climate_on,
+    _cmd_key(ucapi.Climate, ucapi.climate.Commands.OFF): _state_command("off", ucapi.climate.States.OFF),
+    _cmd_key(ucapi.Climate, ucapi.climate.Commands.HVAC_MODE): _climate_hvac_mode,
+    _cmd_key(ucapi.Climate, ucapi.climate.Commands.TARGET_TEMPERATURE): _climate_target_temperature,
+    _cmd_key(ucapi.Climate, ucapi.climate.Commands.TARGET_TEMPERATURE_RANGE): _climate_target_temperature_range,
+}
+
+# (entity class, UC command) -> state in which the command has nothing left to do
+# when sent without parameters
+_NOOP_STATES = {
+    (ucapi.Light, ucapi.light.Commands.ON.value): ucapi.light.States.ON,
+    (ucapi.Light, ucapi.light.Commands.OFF.value): ucapi.light.States.OFF,
+    (ucapi.Switch, ucapi.switch.Commands.ON.value): ucapi.switch.States.ON,
+    (ucapi.Switch, ucapi.switch.Commands.OFF.value): ucapi.switch.States.OFF,
+}
 
 
 async def device_command_handler(
@@ -37,159 +296,45 @@ async def device_command_handler(
     Returns:
         Status code
     """
-    if hubitat_client is None:
+    client = hubitat_client
+    if client is None:
         _LOG.error("Hubitat client not initialized")
         return StatusCodes.SERVICE_UNAVAILABLE
 
+    # Command ids arrive as fresh strings from the WebSocket payload
+    if type(cmd_id) is str:
+        cmd_id = sys.intern(cmd_id)
+
     device_id = entity.id
-    _LOG.info(f"Received command {cmd_id} for device {device_id}")
+    _LOG.info("Received command %s for device %s", cmd_id, device_id)
+
+    key = (type(entity), cmd_id)
+    handler = _CMD_DISPATCH.get(key)
+    if handler is None:
+        _LOG.warning("Unsupported command %s for device %s", cmd_id, device_id)
+        return StatusCodes.NOT_IMPLEMENTED
+
+    # Skip the hub round trip when the entity is already in the requested state;
+    # this is safe because a command the hub rejected never updates the state
+    noop_state = _NOOP_STATES.get(key)
+    if noop_state is not None and not params and entity.attributes.get("state") == noop_state:
+        _LOG.debug("Device %s already in state %s, skipping %s", device_id, noop_state, cmd_id)
+        return StatusCodes.OK
 
     try:
-        # Handle light commands
-        if isinstance(entity, ucapi.Light):
-            if cmd_id == ucapi.light.Commands.ON:
-                # Handle ON command with optional parameters for brightness, color, etc.
-                if params:
-                    # Handle brightness
-                    if "brightness" in params:
-                        brightness = params["brightness"]
-                        await hubitat_client.send_command(device_id, "setLevel", [brightness])
-                        entity.attributes["brightness"] = brightness
-
-                    # Handle color (hue/saturation)
-                    if "hue" in params and "saturation" in params:
-                        hue = params["hue"]
-                        saturation = params["saturation"]
-                        await hubitat_client.send_command(device_id, "setColor", [{"hue": hue, "saturation": saturation}])
-                        entity.attributes["hue"] = hue
-                        entity.attributes["saturation"] = saturation
-
-                    # Handle color temperature
-                    if "color_temperature" in params:
-                        color_temp = params["color_temperature"]
-                        await hubitat_client.send_command(device_id, "setColorTemperature", [color_temp])
-                        entity.attributes["color_temperature"] = color_temp
-
-                # Always turn on
-                await hubitat_client.send_command(device_id, "on")
-                entity.attributes["state"] = ucapi.light.States.ON
-
-            elif cmd_id == ucapi.light.Commands.OFF:
-                await hubitat_client.send_command(device_id, "off")
-                entity.attributes["state"] = ucapi.light.States.OFF
-
-            elif cmd_id == ucapi.light.Commands.TOGGLE:
-                current_state = entity.attributes.get("state", ucapi.light.States.OFF)
-                if current_state == ucapi.light.States.ON:
-                    await hubitat_client.send_command(device_id, "off")
-                    entity.attributes["state"] = ucapi.light.States.OFF
-                else:
-                    await hubitat_client.send_command(device_id, "on")
-                    entity.attributes["state"] = ucapi.light.States.ON
-
-            api.configured_entities.update_attributes(entity.id, entity.attributes)
-
-        # Handle switch commands
-        elif isinstance(entity, ucapi.Switch):
-            if cmd_id == ucapi.switch.Commands.ON:
-                await hubitat_client.send_command(device_id, "on")
-                entity.attributes["state"] = ucapi.switch.States.ON
-
-            elif cmd_id == ucapi.switch.Commands.OFF:
-                await hubitat_client.send_command(device_id, "off")
-                entity.attributes["state"] = ucapi.switch.States.OFF
-
-            elif cmd_id == ucapi.switch.Commands.TOGGLE:
-                current_state = entity.attributes.get("state", ucapi.switch.States.OFF)
-                if current_state == ucapi.switch.States.ON:
-                    await hubitat_client.send_command(device_id, "off")
-                    entity.attributes["state"] = ucapi.switch.States.OFF
-                else:
-                    await hubitat_client.send_command(device_id, "on")
-                    entity.attributes["state"] = ucapi.switch.States.ON
-
-            api.configured_entities.update_attributes(entity.id, entity.attributes)
-
-        # Handle climate commands
-        elif isinstance(entity, ucapi.Climate):
-            if cmd_id == ucapi.climate.Commands.ON:
-                # Turn on to last mode (default to heat)
-                last_mode = entity.attributes.get("state", ucapi.climate.States.HEAT)
-                if last_mode == ucapi.climate.States.OFF:
-                    last_mode = ucapi.climate.States.HEAT
-
-                if last_mode == ucapi.climate.States.HEAT:
-                    await hubitat_client.send_command(device_id, "heat")
-                    entity.attributes["state"] = ucapi.climate.States.HEAT
-                elif last_mode == ucapi.climate.States.COOL:
-                    await hubitat_client.send_command(device_id, "cool")
-                    entity.attributes["state"] = ucapi.climate.States.COOL
-                elif last_mode == ucapi.climate.States.AUTO:
-                    await hubitat_client.send_command(device_id, "auto")
-                    entity.attributes["state"] = ucapi.climate.States.AUTO
-
-            elif cmd_id == ucapi.climate.Commands.OFF:
-                await hubitat_client.send_command(device_id, "off")
-                entity.attributes["state"] = ucapi.climate.States.OFF
-
-            elif cmd_id == ucapi.climate.Commands.HVAC_MODE:
-                # Change HVAC mode
-                if params and "hvac_mode" in params:
-                    mode = params["hvac_mode"]
-                    if mode == "off":
-                        await hubitat_client.send_command(device_id, "off")
-                        entity.attributes["state"] = ucapi.climate.States.OFF
-                    elif mode == "heat":
-                        await hubitat_client.send_command(device_id, "heat")
-                        entity.attributes["state"] = ucapi.climate.States.HEAT
-                    elif mode == "cool":
-                        await hubitat_client.send_command(device_id, "cool")
-                        entity.attributes["state"] = ucapi.climate.States.COOL
-                    elif mode == "auto":
-                        await hubitat_client.send_command(device_id, "auto")
-                        entity.attributes["state"] = ucapi.climate.States.AUTO
-
-            elif cmd_id == ucapi.climate.Commands.TARGET_TEMPERATURE:
-                # Set target temperature
-                if params and "temperature" in params:
-                    temp = params["temperature"]
-                    current_state = entity.attributes.get("state", ucapi.climate.States.HEAT)
-
-                    if current_state == ucapi.climate.States.HEAT:
-                        await hubitat_client.send_command(device_id, "setHeatingSetpoint", [temp])
-                        entity.attributes["target_temperature_heat"] = float(temp)
-                        entity.attributes["target_temperature"] = float(temp)
-                    elif current_state == ucapi.climate.States.COOL:
-                        await hubitat_client.send_command(device_id, "setCoolingSetpoint", [temp])
-                        entity.attributes["target_temperature_cool"] = float(temp)
-                        entity.attributes["target_temperature"] = float(temp)
-                    else:
-                        # If in auto or off mode, set heating setpoint by default
-                        await hubitat_client.send_command(device_id, "setHeatingSetpoint", [temp])
-                        entity.attributes["target_temperature"] = float(temp)
-
-            elif cmd_id == ucapi.climate.Commands.TARGET_TEMPERATURE_HEAT:
-                # Set heating target temperature
-                if params and "temperature" in params:
-                    temp = params["temperature"]
-                    await hubitat_client.send_command(device_id, "setHeatingSetpoint", [temp])
-                    entity.attributes["target_temperature_heat"] = float(temp)
-                    entity.attributes["target_temperature"] = float(temp)
-
-            elif cmd_id == ucapi.climate.Commands.TARGET_TEMPERATURE_COOL:
-                # Set cooling target temperature
-                if params and "temperature" in params:
-                    temp = params["temperature"]
-                    await hubitat_client.send_command(device_id, "setCoolingSetpoint", [temp])
-                    entity.attributes["target_temperature_cool"] = float(temp)
-                    entity.attributes["target_temperature"] = float(temp)
-
-            api.configured_entities.update_attributes(entity.id, entity.attributes)
-
+        delta = await handler(entity, params, client)
+        if delta is None:
+            _LOG.error("Hub rejected command %s for device %s", cmd_id, device_id)
+            return StatusCodes.SERVER_ERROR
+        if delta:
+            # Keep the local entity current even if it is not subscribed, then
+            # send only the changed attributes to the Remote
+            entity.attributes.update(delta)
+            api.configured_entities.update_attributes(entity.id, delta)
         return StatusCodes.OK
 
     except Exception as e:
-        _LOG.error(f"Error handling command: {e}")
+        _LOG.error("Error handling command: %s", e)
         return StatusCodes.SERVER_ERROR
 
 
@@ -197,41 +342,120 @@ async def load_devices():
     """Load devices from Hubitat and create entities."""
     global entities
 
-    if hubitat_client is None:
+    client = hubitat_client
+    if client is None:
         _LOG.error("Hubitat client not initialized")
         return
 
     _LOG.info("Loading devices from Hubitat")
 
     try:
-        devices = await hubitat_client.get_all_devices()
+        devices = await client.get_all_devices()
 
+        # Build entities in a single pass, reusing the capability set computed
+        # during classification; a malformed device is skipped, not fatal
+        new_entities = {}
         for device in devices:
-            entity_type = EntityMapper.get_entity_type(device)
-
-            if entity_type is None:
+            try:
+                entity_type, caps = EntityMapper.classify(device)
+                factory = _TYPE_TABLE.get(entity_type)
+                if factory is None:
+                    continue
+                entity = factory(device, device_command_handler, caps)
+            except Exception as e:
+                device_id = device.get("id") if isinstance(device, dict) else None
+                _LOG.error("Skipping device %s: %s", device_id, e)
                 continue
+            new_entities[entity.id] = entity
+
+        for entity in new_entities.values():
+            api.available_entities.add(entity)
+        entities.update(new_entities)
 
-            device_id = str(device["id"])
+        _LOG.info("Loaded %s entities (%s from %s devices)", len(entities), len(new_entities), len(devices))
 
-            # Create appropriate entity
-            if entity_type == "light":
-                entity = EntityMapper.create_light_entity(device, device_command_handler)
-            elif entity_type == "switch":
-                entity = EntityMapper.create_switch_entity(device, device_command_handler)
-            elif entity_type == "climate":
-                entity = EntityMapper.create_climate_entity(device, device_command_handler)
-            else:
+    except Exception as e:
+        _LOG.error("Error loading devices: %s", e)
+
+
+def _handle_event(event: dict[str, Any]) -> None:
+    """
+    Apply a Hubitat device event to its entity and notify the Remote.
+
+    Args:
+        event: Device event from the hub's event socket
+    """
+    entity = entities.get(str(event.get("deviceId")))
+    if entity is None:
+        return
+
+    uc_attr = EntityMapper.apply_event(entity, event.get("name"), event.get("value"))
+    if uc_attr is not None:
+        api.configured_entities.update_attributes(entity.id, {uc_attr: entity.attributes[uc_attr]})
+
+
+async def _refresh_states(client: HubitatClient) -> None:
+    """Re-read all device states, catching up on events missed while disconnected."""
+    devices = await client.get_all_devices()
+    for device in devices:
+        # A malformed device is skipped, not fatal, as in load_devices
+        try:
+            entity = entities.get(str(device["id"]))
+            if entity is None:
                 continue
+            EntityMapper.update_entity_state(entity, device)
+        except Exception as e:
+            device_id = device.get("id") if isinstance(device, dict) else None
+            _LOG.error("Skipping device %s: %s", device_id, e)
+            continue
+        api.configured_entities.update_attributes(entity.id, entity.attributes)
 
-            entities[device_id] = entity
-            api.available_entities.add(entity)
-            _LOG.info(f"Added {entity_type} entity: {entity.name} (ID: {device_id})")
 
-        _LOG.info(f"Loaded {len(entities)} entities")
+async def _run_event_stream(client: HubitatClient) -> None:
+    """
+    Keep entity state in sync with the hub's event socket, reconnecting on failure.
 
-    except Exception as e:
-        _LOG.error(f"Error loading devices: {e}")
+    Args:
+        client: Hubitat client to stream events from
+    """
+    delay = _EVENT_RECONNECT_DELAY
+    reconnect = False
+
+    while True:
+        # After a reconnect, catch up on missed changes once the socket is open,
+        # so changes made while refreshing arrive as events afterwards
+        on_connect = (lambda: _refresh_states(client)) if reconnect else None
+        try:
+            async for event in client.event_stream(on_connect):
+                delay = _EVENT_RECONNECT_DELAY
+                _handle_event(event)
+            _LOG.warning("Hubitat event socket closed")
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            _LOG.warning("Hubitat event socket error: %s", e)
+
+        reconnect = True
+        await asyncio.sleep(delay)
+        delay = min(delay * 2, _EVENT_RECONNECT_MAX_DELAY)
+
+
+def _start_event_stream() -> None:
+    """Start streaming device events for the current Hubitat client."""
+    global _event_task
+
+    _stop_event_stream()
+    if hubitat_client is not None:
+        _event_task = asyncio.create_task(_run_event_stream(hubitat_client))
+
+
+def _stop_event_stream() -> None:
+    """Stop the running event stream task, if any."""
+    global _event_task
+
+    if _event_task is not None:
+        _event_task.cancel()
+        _event_task = None
 
 
 @api.listens_to(ucapi.Events.CONNECT)
@@ -267,11 +491,12 @@ async def on_subscribe_entities(entity_ids: list[str]) -> None:
     Args:
         entity_ids: List of entity IDs being subscribed to
     """
-    _LOG.info(f"Subscribed to entities: {entity_ids}")
+    _LOG.info("Subscribed to entities: %s", entity_ids)
 
     for entity_id in entity_ids:
-        if entity_id in entities:
-            api.configured_entities.add(entities[entity_id])
+        entity = entities.get(entity_id)
+        if entity is not None:
+            api.configured_entities.add(entity)
 
 
 @api.listens_to(ucapi.Events.UNSUBSCRIBE_ENTITIES)
@@ -282,12 +507,39 @@ async def on_unsubscribe_entities(entity_ids: list[str]) -> None:
     Args:
         entity_ids: List of entity IDs being unsubscribed from
     """
-    _LOG.info(f"Unsubscribed from entities: {entity_ids}")
+    _LOG.info("Unsubscribed from entities: %s", entity_ids)
 
     for entity_id in entity_ids:
         api.configured_entities.remove(entity_id)
 
 
+# Setup input requested from the user when no setup data is provided
+_SETUP_INPUT_TITLE = {"en": "Hubitat Configuration"}
+_SETUP_INPUT_FIELDS = [
+    {
+        "field": {"text": {"value": ""}},
+        "id": "hub_address",
+        "label": {
+            "en": "Hub IP Address or Hostname",
+        },
+    },
+    {
+        "field": {"text": {"value": ""}},
+        "id": "maker_api_id",
+        "label": {
+            "en": "Maker API App ID",
+        },
+    },
+    {
+        "field": {"text": {"value": ""}},
+        "id": "access_token",
+        "label": {
+            "en": "Maker API Access Token",
+        },
+    },
+]
+
+
 async def handle_driver_setup(msg: ucapi.SetupDriver) -> ucapi.SetupAction:
     """
     Handle driver setup process.
@@ -314,32 +566,7 @@ async def handle_driver_setup(msg: ucapi.SetupDriver) -> ucapi.SetupAction:
         return await handle_user_data_response(user_data)
 
     # Otherwise, request Hubitat configuration
-    return ucapi.RequestUserInput(
-        {"en": "Hubitat Configuration"},
-        [
-            {
-                "field": {"text": {"value": ""}},
-                "id": "hub_address",
-                "label": {
-                    "en": "Hub IP Address or Hostname",
-                },
-            },
-            {
-                "field": {"text": {"value": ""}},
-                "id": "maker_api_id",
-                "label": {
-                    "en": "Maker API App ID",
-                },
-            },
-            {
-                "field": {"text": {"value": ""}},
-                "id": "access_token",
-                "label": {
-                    "en": "Maker API Access Token",
-                },
-            },
-        ],
-    )
+    return ucapi.RequestUserInput(_SETUP_INPUT_TITLE, _SETUP_INPUT_FIELDS)
 
 
 async def handle_user_data_response(msg: ucapi.UserDataResponse) -> ucapi.SetupAction:
@@ -371,8 +598,6 @@ async def handle_user_data_response(msg: ucapi.UserDataResponse) -> ucapi.SetupA
         await test_client.close()
         return ucapi.SetupError(error_type=ucapi.IntegrationSetupError.CONNECTION_REFUSED)
 
-    await test_client.close()
-
     # Save configuration
     config = HubitatConfig(
         hub_address=hub_address,
@@ -382,13 +607,18 @@ async def handle_user_data_response(msg: ucapi.UserDataResponse) -> ucapi.SetupA
 
     if not config_manager.save(config):
         _LOG.error("Failed to save configuration")
+        await test_client.close()
         return ucapi.SetupError(error_type=ucapi.IntegrationSetupError.OTHER)
 
-    # Initialize client
-    hubitat_client = HubitatClient(hub_address, maker_api_id, access_token)
+    # Keep the tested client so the device list it just fetched is served from cache
+    _stop_event_stream()
+    if hubitat_client is not None:
+        await hubitat_client.close()
+    hubitat_client = test_client
 
     # Load devices
     await load_devices()
+    _start_event_stream()
 
     _LOG.info("Setup completed successfully")
     return ucapi.SetupComplete()
@@ -412,14 +642,13 @@ async def driver_setup_handler(msg: ucapi.SetupDriver) -> ucapi.SetupAction:
         _LOG.info("Setup aborted by user")
         return ucapi.SetupError()
     else:
-        _LOG.error(f"Unsupported setup message: {msg}")
+        _LOG.error("Unsupported setup message: %s", msg)
         return ucapi.SetupError()
 
 
 async def main():
     """Initialize and run the integration."""
     import os
-    import sys
 
     logging.basicConfig(
         level=logging.INFO,
@@ -439,7 +668,9 @@ async def main():
             config.maker_api_id,
             config.access_token,
         )
+        await hubitat_client.start_session()
         await load_devices()
+        _start_event_stream()
         await api.set_device_state(ucapi.DeviceStates.CONNECTED)
     else:
         _LOG.info("No configuration found, waiting for setup")
@@ -449,9 +680,9 @@ async def main():
         # Running as PyInstaller bundle
         # On UC Remote, the driver runs from /app/driver with cwd=/app
         # driver.json is one level up from the bin directory
-        _LOG.info(f"PyInstaller bundle detected")
-        _LOG.info(f"  sys.executable: {sys.executable}")
-        _LOG.info(f"  cwd: {os.getcwd()}")
+        _LOG.info("PyInstaller bundle detected")
+        _LOG.info("  sys.executable: %s", sys.executable)
+        _LOG.info("  cwd: %s", os.getcwd())
 
         # Try multiple possible locations for driver.json
         possible_paths = [
@@ -463,23 +694,23 @@ async def main():
         driver_json_path = None
         for path in possible_paths:
             abs_path = os.path.abspath(path)
-            _LOG.info(f"  Checking: {path} -> {abs_path}")
+            _LOG.info("  Checking: %s -> %s", path, abs_path)
             if os.path.exists(abs_path):
                 driver_json_path = abs_path
-                _LOG.info(f"  Found driver.json at: {driver_json_path}")
+                _LOG.info("  Found driver.json at: %s", driver_json_path)
                 break
 
         if not driver_json_path:
-            _LOG.error(f"driver.json not found in any of these locations:")
+            _LOG.error("driver.json not found in any of these locations:")
             for path in possible_paths:
-                _LOG.error(f"  - {os.path.abspath(path)}")
-            _LOG.error(f"Directory listing of {os.getcwd()}: {os.listdir('.')}")
-            _LOG.error(f"Directory listing of {os.path.dirname(os.getcwd())}: {os.listdir('..')}")
+                _LOG.error("  - %s", os.path.abspath(path))
+            _LOG.error("Directory listing of %s: %s", os.getcwd(), os.listdir('.'))
+            _LOG.error("Directory listing of %s: %s", os.path.dirname(os.getcwd()), os.listdir('..'))
             raise FileNotFoundError("driver.json not found")
     else:
         # Running as normal Python script
         driver_json_path = "intg-hubitat/driver.json"
-        _LOG.info(f"Running as Python script, using: {driver_json_path}")
+        _LOG.info("Running as Python script, using: %s", driver_json_path)
 
     await api.init(driver_json_path, driver_setup_handler)
 
@@ -491,6 +722,7 @@ if __name__ == "__main__":
     except KeyboardInterrupt:
         _LOG.info("Shutting down")
     finally:
+        _stop_event_stream()
         if hubitat_client:
             loop.run_until_complete(hubitat_client.close())
         loop.close()
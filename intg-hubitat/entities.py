@@ -1,16 +1,21 @@
 """Entity mapping between Hubitat devices and UC entities."""
 
+import functools
 import logging
-from typing import Any
-from enum import StrEnum
+from typing import Any, Callable
 
 import ucapi
 
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
 _LOG = logging.getLogger(__name__)
 
 
-class HubitatCapability(StrEnum):
-    """Hubitat device capabilities."""
+class HubitatCapability:
+    """Hubitat device capabilities (plain str constants for fast comparisons)."""
 
     SWITCH = "Switch"
     SWITCH_LEVEL = "SwitchLevel"
@@ -25,107 +30,227 @@ class HubitatCapability(StrEnum):
     HUMIDITY_MEASUREMENT = "RelativeHumidityMeasurement"
 
 
+# Either capability alone makes a device a light
+_LIGHT_CAPABILITIES = frozenset({HubitatCapability.LIGHT, HubitatCapability.COLOR_CONTROL})
+
+# Hubitat thermostat mode -> UC climate state
+_CLIMATE_MODE_STATE = {
+    "off": ucapi.climate.States.OFF,
+    "heat": ucapi.climate.States.HEAT,
+    "cool": ucapi.climate.States.COOL,
+    "auto": ucapi.climate.States.AUTO,
+}
+
+# Supported Hubitat thermostat mode -> UC climate feature
+_CLIMATE_MODE_FEATURES = {
+    "heat": ucapi.climate.Features.HEAT,
+    "cool": ucapi.climate.Features.COOL,
+    "auto": ucapi.climate.Features.TARGET_TEMPERATURE_RANGE,
+}
+
+
+def _switch_state(states: Any) -> Callable[[Any], Any]:
+    """Build a converter from a Hubitat "switch" value to the given UC on/off states."""
+    return lambda value: states.ON if value == "on" else states.OFF
+
+
+# Hubitat attribute -> (UC attribute, value converter), per entity class
+_EVENT_HANDLERS: dict[type, dict[str, tuple[str, Callable[[Any], Any]]]] = {
+    ucapi.Light: {
+        "switch": ("state", _switch_state(ucapi.light.States)),
+        "level": ("brightness", int),
+        "hue": ("hue", float),
+        "saturation": ("saturation", float),
+        "colorTemperature": ("color_temperature", int),
+    },
+    ucapi.Switch: {
+        "switch": ("state", _switch_state(ucapi.switch.States)),
+    },
+    ucapi.Climate: {
+        "thermostatMode": ("state", lambda value: _CLIMATE_MODE_STATE.get(value, ucapi.climate.States.OFF)),
+        "temperature": ("current_temperature", float),
+        "thermostatSetpoint": ("target_temperature", float),
+        "heatingSetpoint": ("target_temperature_low", float),
+        "coolingSetpoint": ("target_temperature_high", float),
+    },
+}
+
+
+def _normalize_attributes(attributes: Any) -> dict[str, Any]:
+    """
+    Convert Hubitat attributes format to simple dict.
+
+    Hubitat returns attributes as list of objects:
+    [{"name": "switch", "currentValue": "on", ...}, ...]
+
+    We convert to: {"switch": "on", ...}
+    """
+    if isinstance(attributes, dict):
+        return attributes
+
+    if isinstance(attributes, list):
+        try:
+            return {
+                attr["name"]: attr["currentValue"] for attr in attributes if "name" in attr and "currentValue" in attr
+            }
+        except TypeError:
+            # Malformed entry (not an object); fall back to checking each item
+            return {
+                attr["name"]: attr["currentValue"]
+                for attr in attributes
+                if isinstance(attr, dict) and "name" in attr and "currentValue" in attr
+            }
+
+    return {}
+
+
+def _coerce(attrs: dict[str, Any], key: str, default: Any, cast: Callable[[Any], Any] = float) -> Any:
+    """Return attrs[key] converted with cast, or the cast default when missing or None."""
+    value = attrs.get(key)
+    return cast(value) if value is not None else cast(default)
+
+
+def _identity(device: dict[str, Any]) -> tuple[str, str]:
+    """Return the entity ID and display name for a device (label, then name, then a generic fallback)."""
+    device_id = str(device["id"])
+    return device_id, device.get("label") or device.get("name") or f"Device {device_id}"
+
+
+def _parse_supported_modes(value: Any) -> list[Any]:
+    """
+    Parse Hubitat's supportedThermostatModes attribute into a list of modes.
+
+    The value is usually a JSON array string ('["heat", "cool"]'), but many
+    drivers report an unquoted list ("[heat, cool]"). Anything else that
+    cannot be read yields no modes rather than an error.
+    """
+    if isinstance(value, list):
+        return value
+    if not isinstance(value, str) or not value:
+        return []
+
+    try:
+        modes = _json.loads(value)
+    except (ValueError, RecursionError):
+        # Not JSON; read it as an unquoted, comma-separated list
+        return [mode.strip() for mode in value.strip("[] ").split(",") if mode.strip()]
+
+    return modes if isinstance(modes, list) else []
+
+
+@functools.lru_cache(maxsize=512)
+def _capability_set(capabilities: tuple[str, ...]) -> frozenset[str]:
+    """Return a shared capability set; devices of the same type repeat the same list."""
+    return frozenset(capabilities)
+
+
 class EntityMapper:
     """Maps Hubitat devices to Unfolded Circle entities."""
 
     @staticmethod
-    def _normalize_attributes(attributes: Any) -> dict[str, Any]:
+    def _cap_set(device: dict[str, Any]) -> frozenset[str]:
         """
-        Convert Hubitat attributes format to simple dict.
-
-        Hubitat returns attributes as list of objects:
-        [{"name": "switch", "currentValue": "on", ...}, ...]
+        Get the capability names of a Hubitat device.
 
-        We convert to: {"switch": "on", ...}
+        Hubitat lists capabilities either as plain names or as objects
+        with a "name" key.
         """
-        if isinstance(attributes, dict):
-            return attributes
+        capabilities = device.get("capabilities", [])
 
-        if isinstance(attributes, list):
-            normalized = {}
-            for attr in attributes:
-                if isinstance(attr, dict) and "name" in attr and "currentValue" in attr:
-                    normalized[attr["name"]] = attr["currentValue"]
-            return normalized
+        if not isinstance(capabilities, list):
+            return frozenset()
 
-        return {}
+        return _capability_set(
+            tuple(cap if isinstance(cap, str) else cap.get("name", "") for cap in capabilities)
+        )
 
     @staticmethod
-    def get_entity_type(device: dict[str, Any]) -> str | None:
+    def classify(device: dict[str, Any]) -> tuple[str | None, frozenset[str]]:
         """
-        Determine UC entity type from Hubitat device capabilities.
+        Determine UC entity type and capability set of a Hubitat device.
+
+        The capability set can be passed on to the create_*_entity
+        factories so they do not rebuild it.
 
         Args:
             device: Hubitat device information
 
         Returns:
-            UC entity type or None if not supported
+            Tuple of UC entity type (or None if not supported) and capability names
         """
-        capabilities = device.get("capabilities", [])
-
-        if isinstance(capabilities, list):
-            cap_list = [cap if isinstance(cap, str) else cap.get("name", "") for cap in capabilities]
-        else:
-            cap_list = []
+        caps = EntityMapper._cap_set(device)
 
         # Check for climate/thermostat (check before lock since thermostats often have both)
-        if HubitatCapability.THERMOSTAT in cap_list:
-            return "climate"
+        if HubitatCapability.THERMOSTAT in caps:
+            return "climate", caps
 
         # Check for light capabilities
-        if (
-            HubitatCapability.LIGHT in cap_list
-            or HubitatCapability.COLOR_CONTROL in cap_list
-            or (HubitatCapability.SWITCH in cap_list and HubitatCapability.SWITCH_LEVEL in cap_list)
+        if not caps.isdisjoint(_LIGHT_CAPABILITIES) or (
+            HubitatCapability.SWITCH in caps and HubitatCapability.SWITCH_LEVEL in caps
         ):
-            return "light"
+            return "light", caps
 
         # Check for switch
-        if HubitatCapability.SWITCH in cap_list:
-            return "switch"
+        if HubitatCapability.SWITCH in caps:
+            return "switch", caps
 
         # Check for lock
-        if HubitatCapability.LOCK in cap_list:
-            return "lock"
+        if HubitatCapability.LOCK in caps:
+            return "lock", caps
 
         # Sensors aren't typically controllable entities
         _LOG.debug(f"Device {device.get('name')} has no supported entity type")
-        return None
+        return None, caps
+
+    @staticmethod
+    def get_entity_type(device: dict[str, Any]) -> str | None:
+        """
+        Determine UC entity type from Hubitat device capabilities.
+
+        Args:
+            device: Hubitat device information
+
+        Returns:
+            UC entity type or None if not supported
+        """
+        return EntityMapper.classify(device)[0]
 
     @staticmethod
-    def create_light_entity(device: dict[str, Any], cmd_handler) -> ucapi.Light:
+    def create_light_entity(
+        device: dict[str, Any], cmd_handler, caps: frozenset[str] | None = None
+    ) -> ucapi.Light:
         """
         Create UC light entity from Hubitat device.
 
         Args:
             device: Hubitat device information
             cmd_handler: Command handler function
+            caps: Capability names from classify(), computed if not given
 
         Returns:
             UC Light entity
         """
-        device_id = str(device["id"])
-        name = device.get("label") or device.get("name", f"Device {device_id}")
+        device_id, name = _identity(device)
 
-        capabilities = device.get("capabilities", [])
-        cap_list = [cap if isinstance(cap, str) else cap.get("name", "") for cap in capabilities]
+        if caps is None:
+            caps = EntityMapper._cap_set(device)
 
         features = [ucapi.light.Features.ON_OFF]
 
         # Check for dimming
-        if HubitatCapability.SWITCH_LEVEL in cap_list:
+        if HubitatCapability.SWITCH_LEVEL in caps:
             features.append(ucapi.light.Features.DIM)
 
         # Check for color
-        if HubitatCapability.COLOR_CONTROL in cap_list:
+        if HubitatCapability.COLOR_CONTROL in caps:
             features.append(ucapi.light.Features.COLOR)
 
         # Check for color temperature
-        if HubitatCapability.COLOR_TEMPERATURE in cap_list:
+        if HubitatCapability.COLOR_TEMPERATURE in caps:
             features.append(ucapi.light.Features.COLOR_TEMPERATURE)
 
         # Get current state
-        attributes = EntityMapper._normalize_attributes(device.get("attributes", {}))
+        attributes = _normalize_attributes(device.get("attributes", {}))
         state = ucapi.light.States.OFF
 
         switch_state = attributes.get("switch", "off")
@@ -143,78 +268,49 @@ class EntityMapper:
 
         # Set brightness if available
         if ucapi.light.Features.DIM in features:
-            level = attributes.get("level", 0)
-            if level is not None:
-                entity.attributes["brightness"] = int(level)
-            else:
-                entity.attributes["brightness"] = 0
+            entity.attributes["brightness"] = _coerce(attributes, "level", 0, int)
 
         # Set color if available
         if ucapi.light.Features.COLOR in features:
-            hue = attributes.get("hue", 0)
-            saturation = attributes.get("saturation", 0)
-            if hue is not None and saturation is not None:
-                entity.attributes["hue"] = float(hue)
-                entity.attributes["saturation"] = float(saturation)
-            else:
-                entity.attributes["hue"] = 0.0
-                entity.attributes["saturation"] = 0.0
+            entity.attributes["hue"] = _coerce(attributes, "hue", 0)
+            entity.attributes["saturation"] = _coerce(attributes, "saturation", 0)
 
         # Set color temperature if available
         if ucapi.light.Features.COLOR_TEMPERATURE in features:
-            color_temp = attributes.get("colorTemperature", 0)
-            if color_temp is not None:
-                entity.attributes["color_temperature"] = int(color_temp)
-            else:
-                entity.attributes["color_temperature"] = 0
+            entity.attributes["color_temperature"] = _coerce(attributes, "colorTemperature", 0, int)
 
         return entity
 
     @staticmethod
-    def create_climate_entity(device: dict[str, Any], cmd_handler) -> ucapi.Climate:
+    def create_climate_entity(
+        device: dict[str, Any], cmd_handler, caps: frozenset[str] | None = None
+    ) -> ucapi.Climate:
         """
         Create UC climate entity from Hubitat thermostat device.
 
         Args:
             device: Hubitat device information
             cmd_handler: Command handler function
+            caps: Capability names from classify() (unused, accepted for a uniform factory signature)
 
         Returns:
             UC Climate entity
         """
-        device_id = str(device["id"])
-        name = device.get("label") or device.get("name", f"Device {device_id}")
+        device_id, name = _identity(device)
 
-        attributes = EntityMapper._normalize_attributes(device.get("attributes", {}))
+        attributes = _normalize_attributes(device.get("attributes", {}))
 
         # Determine features based on supported modes
         features = [ucapi.climate.Features.ON_OFF]
-        supported_modes_str = attributes.get("supportedThermostatModes", "[]")
-
-        # Parse supported modes (it's a JSON string)
-        import json
-        try:
-            supported_modes = json.loads(supported_modes_str) if isinstance(supported_modes_str, str) else supported_modes_str
-        except:
-            supported_modes = []
+        supported_modes = _parse_supported_modes(attributes.get("supportedThermostatModes"))
 
-        if "heat" in supported_modes:
-            features.append(ucapi.climate.Features.HEAT)
-        if "cool" in supported_modes:
-            features.append(ucapi.climate.Features.COOL)
+        # Only string entries can name a mode; anything else (e.g. objects) is ignored
+        modes_set = frozenset(mode for mode in supported_modes if isinstance(mode, str))
+        features.extend(feature for mode, feature in _CLIMATE_MODE_FEATURES.items() if mode in modes_set)
 
         # Get current state
         current_mode = attributes.get("thermostatMode", "off")
-        if current_mode == "off":
-            state = ucapi.climate.States.OFF
-        elif current_mode == "heat":
-            state = ucapi.climate.States.HEAT
-        elif current_mode == "cool":
-            state = ucapi.climate.States.COOL
-        elif current_mode == "auto":
-            state = ucapi.climate.States.AUTO
-        else:
-            state = ucapi.climate.States.OFF
+        state = _CLIMATE_MODE_STATE.get(current_mode, ucapi.climate.States.OFF)
 
         # Create entity
         entity = ucapi.Climate(
@@ -228,47 +324,40 @@ class EntityMapper:
         )
 
         # Set temperature attributes
-        current_temp = attributes.get("temperature", 20)
-        if current_temp is not None:
-            entity.attributes["current_temperature"] = float(current_temp)
-        else:
-            entity.attributes["current_temperature"] = 20.0
-
-        target_temp = attributes.get("thermostatSetpoint", 20)
-        if target_temp is not None:
-            entity.attributes["target_temperature"] = float(target_temp)
-        else:
-            entity.attributes["target_temperature"] = 20.0
+        entity.attributes["current_temperature"] = _coerce(attributes, "temperature", 20)
+        entity.attributes["target_temperature"] = _coerce(attributes, "thermostatSetpoint", 20)
 
         # Set heating/cooling setpoints if available
         if ucapi.climate.Features.HEAT in features:
             heat_setpoint = attributes.get("heatingSetpoint", 20)
             if heat_setpoint is not None:
-                entity.attributes["target_temperature_heat"] = float(heat_setpoint)
+                entity.attributes["target_temperature_low"] = float(heat_setpoint)
 
         if ucapi.climate.Features.COOL in features:
             cool_setpoint = attributes.get("coolingSetpoint", 24)
             if cool_setpoint is not None:
-                entity.attributes["target_temperature_cool"] = float(cool_setpoint)
+                entity.attributes["target_temperature_high"] = float(cool_setpoint)
 
         return entity
 
     @staticmethod
-    def create_switch_entity(device: dict[str, Any], cmd_handler) -> ucapi.Switch:
+    def create_switch_entity(
+        device: dict[str, Any], cmd_handler, caps: frozenset[str] | None = None
+    ) -> ucapi.Switch:
         """
         Create UC switch entity from Hubitat device.
 
         Args:
             device: Hubitat device information
             cmd_handler: Command handler function
+            caps: Capability names from classify() (unused, accepted for a uniform factory signature)
 
         Returns:
             UC Switch entity
         """
-        device_id = str(device["id"])
-        name = device.get("label") or device.get("name", f"Device {device_id}")
+        device_id, name = _identity(device)
 
-        attributes = EntityMapper._normalize_attributes(device.get("attributes", {}))
+        attributes = _normalize_attributes(device.get("attributes", {}))
         state = ucapi.switch.States.OFF
 
         switch_state = attributes.get("switch", "off")
@@ -288,33 +377,55 @@ class EntityMapper:
         """
         Update entity state from Hubitat device attributes.
 
+        Uses the same attribute table as apply_event, so only the attributes
+        relevant to the entity type are looked up and converted.
+
         Args:
             entity: UC entity to update
             device: Hubitat device information
         """
-        attributes = EntityMapper._normalize_attributes(device.get("attributes", {}))
+        handlers = _EVENT_HANDLERS.get(type(entity))
+        if not handlers:
+            return
+
+        attributes = _normalize_attributes(device.get("attributes", {}))
+        entity_attributes = entity.attributes
+
+        for attr_name, (uc_attr, convert) in handlers.items():
+            value = attributes.get(attr_name)
+            if value is None:
+                continue
+            try:
+                entity_attributes[uc_attr] = convert(value)
+            except (TypeError, ValueError):
+                _LOG.debug("Ignoring invalid %s value for %s: %r", attr_name, entity.id, value)
 
-        # Update based on entity type
-        if isinstance(entity, ucapi.Light):
-            switch_state = attributes.get("switch", "off")
-            entity.attributes["state"] = (
-                ucapi.light.States.ON if switch_state == "on" else ucapi.light.States.OFF
-            )
+    @staticmethod
+    def apply_event(entity: ucapi.Entity, attr_name: str, value: Any) -> str | None:
+        """
+        Apply a single Hubitat attribute change to an entity.
 
-            if "level" in attributes:
-                entity.attributes["brightness"] = int(attributes["level"])
+        Fast path for device events: updates one entity attribute in place
+        without normalizing the full device attribute list.
 
-            if "hue" in attributes:
-                entity.attributes["hue"] = float(attributes["hue"])
+        Args:
+            entity: UC entity to update
+            attr_name: Hubitat attribute name (e.g. "switch", "level")
+            value: New attribute value
 
-            if "saturation" in attributes:
-                entity.attributes["saturation"] = float(attributes["saturation"])
+        Returns:
+            Name of the UC attribute that was updated, or None if the event does not apply
+        """
+        handlers = _EVENT_HANDLERS.get(type(entity))
+        handler = handlers.get(attr_name) if handlers else None
+        if handler is None or value is None:
+            return None
 
-            if "colorTemperature" in attributes:
-                entity.attributes["color_temperature"] = int(attributes["colorTemperature"])
+        uc_attr, convert = handler
+        try:
+            entity.attributes[uc_attr] = convert(value)
+        except (TypeError, ValueError):
+            _LOG.debug("Ignoring invalid %s value for %s: %r", attr_name, entity.id, value)
+            return None
 
-        elif isinstance(entity, ucapi.Switch):
-            switch_state = attributes.get("switch", "off")
-            entity.attributes["state"] = (
-                ucapi.switch.States.ON if switch_state == "on" else ucapi.switch.States.OFF
-            )
+        return uc_attr
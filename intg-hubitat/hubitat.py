@@ -1,11 +1,25 @@
 """Hubitat API client for accessing devices and sending commands."""
 
+import asyncio
 import logging
-from typing import Any
+import time
+from typing import Any, AsyncIterator, Awaitable, Callable
 import aiohttp
 
+try:
+    import orjson as _json
+except ImportError:
+    import json as _json
+
 _LOG = logging.getLogger(__name__)
 
+# Seconds a device enumeration or device detail response is served from memory
+_CACHE_TTL = 5.0
+
+# Slider-style commands that are coalesced per device, and the window used to do so
+_DEBOUNCED_COMMANDS = frozenset({"setLevel", "setColor", "setColorTemperature"})
+_DEBOUNCE_DELAY = 0.05
+
 
 class HubitatClient:
     """Client for interacting with Hubitat Maker API."""
@@ -23,51 +37,88 @@ class HubitatClient:
         self.app_id = app_id
         self.access_token = access_token
         self.base_url = f"http://{self.hub_address}/apps/api/{self.app_id}"
+        # Requests are made relative to the session's base URL (the hub origin)
+        self._api_path = f"/apps/api/{self.app_id}"
+        self._params = {"access_token": self.access_token}
         self._session: aiohttp.ClientSession | None = None
+        # (monotonic fetch time, payload) for /devices/all and per-device requests
+        self._devices_cache: tuple[float, list[dict[str, Any]]] | None = None
+        self._device_cache: dict[str, tuple[float, dict[str, Any]]] = {}
+        # ETag and payload of the last 200 response, for conditional requests
+        self._devices_etag: str | None = None
+        self._devices_last: list[dict[str, Any]] = []
+        self._device_etags: dict[str, tuple[str, dict[str, Any]]] = {}
+        # (timer, shared result future, latest parameters) per (device_id, command)
+        self._pending: dict[
+            tuple[str, str], tuple[asyncio.TimerHandle, asyncio.Future, list[Any] | None]
+        ] = {}
+        self._flush_tasks: set[asyncio.Task] = set()
 
     async def get_session(self) -> aiohttp.ClientSession:
         """Get or create aiohttp session."""
         if self._session is None or self._session.closed:
-            self._session = aiohttp.ClientSession()
+            # Keep connections to the hub alive and allow concurrent commands
+            connector = aiohttp.TCPConnector(
+                limit=32, limit_per_host=8, keepalive_timeout=30, force_close=False
+            )
+            self._session = aiohttp.ClientSession(base_url=f"http://{self.hub_address}", connector=connector)
         return self._session
 
+    async def start_session(self) -> None:
+        """Create the aiohttp session up front so the first command does not pay for it."""
+        await self.get_session()
+
     async def close(self):
         """Close the aiohttp session."""
+        for handle, future, _ in self._pending.values():
+            handle.cancel()
+            if not future.done():
+                future.set_result(False)
+        self._pending.clear()
         if self._session and not self._session.closed:
             await self._session.close()
 
+    def invalidate_device(self, device_id: str) -> None:
+        """
+        Drop cached data that may contain stale state for a device.
+
+        Args:
+            device_id: Device ID
+        """
+        self._device_cache.pop(device_id, None)
+        self._devices_cache = None
+
     async def get_all_devices(self) -> list[dict[str, Any]]:
         """
         Get all devices from Hubitat hub with full details.
 
-        Note: The /devices endpoint only returns basic info (id, name, type).
-        We need to fetch each device individually to get capabilities and attributes.
+        Uses the Maker API /devices/all endpoint, which returns capabilities
+        and attributes inline instead of requiring one request per device.
 
         Returns:
             List of device dictionaries with full details
         """
-        url = f"{self.base_url}/devices?access_token={self.access_token}"
+        if self._devices_cache and time.monotonic() - self._devices_cache[0] < _CACHE_TTL:
+            return self._devices_cache[1]
+
+        path = f"{self._api_path}/devices/all"
+        headers = {"If-None-Match": self._devices_etag} if self._devices_etag else None
 
         try:
             session = await self.get_session()
-            async with session.get(url) as response:
-                if response.status == 200:
-                    basic_devices = await response.json()
-                    _LOG.debug(f"Retrieved {len(basic_devices)} devices from Hubitat")
-
-                    # Fetch full details for each device
-                    full_devices = []
-                    for basic_device in basic_devices:
-                        device_id = str(basic_device.get("id"))
-                        full_device = await self.get_device(device_id)
-                        if full_device:
-                            full_devices.append(full_device)
-                        else:
-                            # Fallback to basic info if fetch fails
-                            full_devices.append(basic_device)
-
-                    _LOG.info(f"Retrieved full details for {len(full_devices)} devices")
-                    return full_devices
+            async with session.get(path, params=self._params, headers=headers) as response:
+                # Only trust a 304 if an ETag was actually sent with this request
+                if response.status == 304 and headers:
+                    _LOG.debug("Device list unchanged")
+                    self._devices_cache = (time.monotonic(), self._devices_last)
+                    return self._devices_last
+                elif response.status == 200:
+                    self._devices_etag = response.headers.get("ETag")
+                    devices = _json.loads(await response.read())
+                    _LOG.info(f"Retrieved full details for {len(devices)} devices")
+                    self._devices_last = devices
+                    self._devices_cache = (time.monotonic(), devices)
+                    return devices
                 else:
                     _LOG.error(f"Failed to get devices: HTTP {response.status}")
                     return []
@@ -85,13 +136,29 @@ class HubitatClient:
         Returns:
             Device information or None if not found
         """
-        url = f"{self.base_url}/devices/{device_id}?access_token={self.access_token}"
+        cached = self._device_cache.get(device_id)
+        if cached and time.monotonic() - cached[0] < _CACHE_TTL:
+            return cached[1]
+
+        path = f"{self._api_path}/devices/{device_id}"
+        tagged = self._device_etags.get(device_id)
+        headers = {"If-None-Match": tagged[0]} if tagged else None
 
         try:
             session = await self.get_session()
-            async with session.get(url) as response:
-                if response.status == 200:
-                    return await response.json()
+            async with session.get(path, params=self._params, headers=headers) as response:
+                if response.status == 304 and tagged:
+                    self._device_cache[device_id] = (time.monotonic(), tagged[1])
+                    return tagged[1]
+                elif response.status == 200:
+                    device = _json.loads(await response.read())
+                    etag = response.headers.get("ETag")
+                    if etag:
+                        self._device_etags[device_id] = (etag, device)
+                    else:
+                        self._device_etags.pop(device_id, None)
+                    self._device_cache[device_id] = (time.monotonic(), device)
+                    return device
                 else:
                     _LOG.error(f"Failed to get device {device_id}: HTTP {response.status}")
                     return None
@@ -105,6 +172,62 @@ class HubitatClient:
         """
         Send command to a device.
 
+        Slider-style commands (setLevel, setColor, setColorTemperature) are
+        coalesced per device: calls within a short window share one request
+        carrying the most recent parameters.
+
+        Args:
+            device_id: Device ID
+            command: Command to send
+            parameters: Optional command parameters
+
+        Returns:
+            True if successful, False otherwise
+        """
+        if command not in _DEBOUNCED_COMMANDS:
+            return await self._send_now(device_id, command, parameters)
+
+        key = (device_id, command)
+        pending = self._pending.get(key)
+        if pending is not None:
+            handle, future, _ = pending
+        else:
+            loop = asyncio.get_running_loop()
+            future = loop.create_future()
+            handle = loop.call_later(_DEBOUNCE_DELAY, self._flush, key)
+        self._pending[key] = (handle, future, parameters)
+        return await asyncio.shield(future)
+
+    def _flush(self, key: tuple[str, str]) -> None:
+        """
+        Send the latest parameters collected for a debounced command.
+
+        Args:
+            key: (device_id, command) of the pending command
+        """
+        _, future, parameters = self._pending.pop(key)
+        task = asyncio.ensure_future(self._send_pending(future, *key, parameters))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _send_pending(
+        self, future: asyncio.Future, device_id: str, command: str, parameters: list[Any] | None
+    ) -> None:
+        """Send a coalesced command and resolve every caller waiting on it."""
+        try:
+            result = await self._send_now(device_id, command, parameters)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        if not future.done():
+            future.set_result(result)
+
+    async def _send_now(
+        self, device_id: str, command: str, parameters: list[Any] | None = None
+    ) -> bool:
+        """
+        Send command to a device immediately.
+
         Args:
             device_id: Device ID
             command: Command to send
@@ -115,15 +238,16 @@ class HubitatClient:
         """
         if parameters:
             param_str = "/".join(str(p) for p in parameters)
-            url = f"{self.base_url}/devices/{device_id}/{command}/{param_str}?access_token={self.access_token}"
+            path = f"{self._api_path}/devices/{device_id}/{command}/{param_str}"
         else:
-            url = f"{self.base_url}/devices/{device_id}/{command}?access_token={self.access_token}"
+            path = f"{self._api_path}/devices/{device_id}/{command}"
 
         try:
             session = await self.get_session()
-            async with session.get(url) as response:
+            async with session.get(path, params=self._params) as response:
                 if response.status == 200:
                     _LOG.debug(f"Command {command} sent to device {device_id}")
+                    self.invalidate_device(device_id)
                     return True
                 else:
                     _LOG.error(f"Failed to send command: HTTP {response.status}")
@@ -132,6 +256,44 @@ class HubitatClient:
             _LOG.error(f"Error sending command: {e}")
             return False
 
+    async def event_stream(
+        self, on_connect: Callable[[], Awaitable[None]] | None = None
+    ) -> AsyncIterator[dict[str, Any]]:
+        """
+        Stream device events pushed by the hub's event socket.
+
+        Each event carries a single attribute change, e.g.
+        {"source": "DEVICE", "deviceId": 12, "name": "switch", "value": "on", ...}.
+        Iteration ends when the socket closes; connection errors are raised.
+
+        Args:
+            on_connect: Optional coroutine function awaited once the socket is
+                connected, before any event is yielded; events arriving meanwhile
+                are buffered, so nothing is missed between the two
+
+        Yields:
+            Parsed device events
+        """
+        session = await self.get_session()
+        async with session.ws_connect("/eventsocket", heartbeat=30) as ws:
+            _LOG.info("Connected to Hubitat event socket at %s", self.hub_address)
+            if on_connect is not None:
+                await on_connect()
+            async for msg in ws:
+                if msg.type == aiohttp.WSMsgType.TEXT:
+                    try:
+                        event = _json.loads(msg.data)
+                    except ValueError:
+                        _LOG.debug("Ignoring malformed event: %r", msg.data)
+                        continue
+                    if event.get("source") != "DEVICE":
+                        continue
+                    # Cached device payloads no longer reflect this device's state
+                    self.invalidate_device(str(event.get("deviceId")))
+                    yield event
+                elif msg.type == aiohttp.WSMsgType.ERROR:
+                    raise ws.exception() or aiohttp.ClientError("Event socket error")
+
     async def test_connection(self) -> bool:
         """
         Test connection to Hubitat hub.